@@ -2,13 +2,21 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from collections import deque
 import logging
-from typing import Any
+import random
+import threading
+from typing import Any, Callable
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.typing import ConfigType
@@ -20,6 +28,41 @@ PLATFORMS = [Platform.LIGHT, Platform.SCENE]
 
 CONF_GATEWAY_TOPIC = "gateway_topic"
 
+_JSON_CONTAINER_PREFIXES = (b"{", b"[")
+
+# Seconds to wait for the broker to accept the initial connection
+_CONNECT_TIMEOUT = 10
+
+# Seconds a command waits for the broker connection before it is dropped
+_PUBLISH_CONNECT_TIMEOUT = 5
+
+# Upper bound in seconds for the reconnect backoff
+_RECONNECT_MAX_DELAY = 60
+
+# Pre-serialized power payloads, the most frequently sent commands
+_POWER_ON = b'{"onOff":"on"}'
+_POWER_OFF = b'{"onOff":"off"}'
+
+# Groups support all features
+_GROUP_CAPABILITIES = {
+    "supports_ct": True,
+    "supports_color": True,
+}
+
+
+def _normalize_status(status: dict) -> None:
+    """Convert status values once on ingestion to the types entities expose."""
+    on_off = status.get("onOff")
+    if on_off is not None and not isinstance(on_off, bool):
+        status["onOff"] = isinstance(on_off, str) and on_off.strip().lower() == "on"
+
+    temperature = status.get("temperature")
+    if temperature is not None and not isinstance(temperature, int):
+        try:
+            status["temperature"] = int(temperature)
+        except (TypeError, ValueError):
+            del status["temperature"]
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Häfele Mesh component."""
@@ -44,12 +87,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = HaefeleMeshCoordinator(
         hass, entry, mqtt_host, mqtt_port, gateway_topic, mqtt_username, mqtt_password
     )
-    
-    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     # Connect to MQTT
     await coordinator.async_connect()
 
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
     # Request device discovery
     await coordinator.async_request_discovery()
 
@@ -103,10 +146,39 @@ class HaefeleMeshCoordinator:
         self.mqtt_username = mqtt_username
         self.mqtt_password = mqtt_password
         self.mqtt_client = None
+        self.connected = asyncio.Event()
+        # Mirrors the connected event for cheap reads from entity properties
+        self.is_connected = False
+        self._reconnect_task: asyncio.Task | None = None
+        # Only reset once the broker accepts the session, so a refused CONNACK
+        # keeps backing off instead of redialing right away
+        self._reconnect_attempt = 0
+        self._stopping = False
         self.lights = {}
         self.groups = {}
         self.scenes = {}
-        self._listeners = []
+        self._topic_lights = f"{gateway_topic}/lights"
+        self._topic_groups = f"{gateway_topic}/groups"
+        self._topic_scenes = f"{gateway_topic}/scenes"
+        self._discovery_dispatch = {
+            self._topic_lights: self._handle_lights_discovery,
+            self._topic_groups: self._handle_groups_discovery,
+            self._topic_scenes: self._handle_scenes_discovery,
+        }
+        self._status_prefix_len = len(gateway_topic) + 1
+        # Devices whose status dict holds state reported by the gateway rather
+        # than an optimistic guess, keyed by (kind, name)
+        self._reported: set[tuple[str, str]] = set()
+        # Status updates received before discovery, keyed by (kind, name)
+        self._pending_status: dict[tuple[str, str], Any] = {}
+        # Serialized payloads for commands with a small set of values only, so
+        # the cache stays bounded
+        self._payload_cache: dict[tuple[str, Any], bytes | str] = {}
+        self._inbox: deque[tuple[str, bytes]] = deque()
+        self._inbox_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._listeners: dict[tuple[str, str], set[Callable[[], None]]] = {}
+        self._addition_listeners: dict[str, set[Callable[[dict], None]]] = {}
 
     async def async_connect(self):
         """Connect to MQTT broker."""
@@ -117,24 +189,35 @@ class HaefeleMeshCoordinator:
             if rc == 0:
                 _LOGGER.info("Connected to MQTT broker at %s:%s", self.mqtt_host, self.mqtt_port)
                 _LOGGER.info("Subscribing to topics with base: %s", self.gateway_topic)
-                # Subscribe to discovery topics
-                client.subscribe(f"{self.gateway_topic}/lights")
-                client.subscribe(f"{self.gateway_topic}/groups")
-                client.subscribe(f"{self.gateway_topic}/scenes")
-                # Subscribe to status updates
-                client.subscribe(f"{self.gateway_topic}/lights/+/status")
-                client.subscribe(f"{self.gateway_topic}/groups/+/status")
-                # Subscribe to all messages for debugging
-                client.subscribe(f"{self.gateway_topic}/#")
+                # Subscribe to discovery topics and status updates in one
+                # request. There is no catch-all subscription: it overlaps
+                # these topics, so brokers may deliver every message twice,
+                # and it echoes our own commands back to us.
+                client.subscribe([
+                    (self._topic_lights, 0),
+                    (self._topic_groups, 0),
+                    (self._topic_scenes, 0),
+                    (f"{self._topic_lights}/+/status", 0),
+                    (f"{self._topic_groups}/+/status", 0),
+                ])
                 _LOGGER.info("MQTT subscriptions complete")
+                self.hass.loop.call_soon_threadsafe(self._handle_connect)
             else:
                 _LOGGER.error("Failed to connect to MQTT broker, return code %s", rc)
 
+        def on_disconnect(client, userdata, rc):
+            """Handle MQTT disconnection."""
+            self.hass.loop.call_soon_threadsafe(self._handle_disconnect, rc)
+
         def on_message(client, userdata, msg):
             """Handle incoming MQTT messages."""
-            self.hass.loop.call_soon_threadsafe(
-                self._handle_message, msg.topic, msg.payload.decode()
-            )
+            # Queue the message and wake the event loop once per burst
+            self._inbox.append((msg.topic, msg.payload))
+            with self._inbox_lock:
+                if self._drain_scheduled:
+                    return
+                self._drain_scheduled = True
+            self.hass.loop.call_soon_threadsafe(self._drain_inbox)
 
         self.mqtt_client = mqtt.Client()
         
@@ -144,145 +227,345 @@ class HaefeleMeshCoordinator:
             _LOGGER.info("MQTT authentication configured for user: %s", self.mqtt_username)
         
         self.mqtt_client.on_connect = on_connect
+        self.mqtt_client.on_disconnect = on_disconnect
         self.mqtt_client.on_message = on_message
 
-        # Connect in executor to avoid blocking
-        await self.hass.async_add_executor_job(
-            self.mqtt_client.connect, self.mqtt_host, self.mqtt_port, 60
-        )
+        # Let paho connect on its network thread instead of holding an
+        # executor thread for the whole handshake
+        self.mqtt_client.connect_async(self.mqtt_host, self.mqtt_port, 60)
         await self.hass.async_add_executor_job(self.mqtt_client.loop_start)
 
+        try:
+            await asyncio.wait_for(self.connected.wait(), _CONNECT_TIMEOUT)
+        except asyncio.TimeoutError as err:
+            await self.async_disconnect()
+            raise ConfigEntryNotReady(
+                f"Timed out connecting to MQTT broker at {self.mqtt_host}:{self.mqtt_port}"
+            ) from err
+
     async def async_disconnect(self):
         """Disconnect from MQTT broker."""
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
         if self.mqtt_client:
             await self.hass.async_add_executor_job(self.mqtt_client.loop_stop)
             await self.hass.async_add_executor_job(self.mqtt_client.disconnect)
 
+    def _handle_connect(self):
+        """Handle an established connection on the event loop."""
+        self._reconnect_attempt = 0
+        self.connected.set()
+        if not self.is_connected:
+            self.is_connected = True
+            self._notify_all_listeners()
+
+    def _handle_disconnect(self, rc: int):
+        """Handle a lost connection on the event loop."""
+        self.connected.clear()
+        if self.is_connected:
+            self.is_connected = False
+            self._notify_all_listeners()
+        # rc 0 means the disconnect was requested by us
+        if rc == 0 or self._stopping:
+            return
+        _LOGGER.warning("Lost connection to MQTT broker, return code %s", rc)
+        if self._reconnect_task is None or self._reconnect_task.done():
+            # A background task, so Home Assistant does not wait for the retry
+            # loop at shutdown while the broker is down
+            self._reconnect_task = self.entry.async_create_background_task(
+                self.hass, self._async_reconnect(), "haefele_mesh_reconnect"
+            )
+
+    async def _async_reconnect(self):
+        """Reconnect to the MQTT broker with exponential backoff and jitter."""
+        client = self.mqtt_client
+        # Stop paho's network loop so it does not retry with its own backoff
+        await self.hass.async_add_executor_job(client.loop_stop)
+        if client.is_connected():
+            await self.hass.async_add_executor_job(client.loop_start)
+            return
+
+        while True:
+            attempt = self._reconnect_attempt
+            delay = min(_RECONNECT_MAX_DELAY, 1 << attempt) + random.random()
+            self._reconnect_attempt = min(attempt + 1, 6)
+            await asyncio.sleep(delay)
+            try:
+                await self.hass.async_add_executor_job(client.reconnect)
+            except OSError as err:
+                _LOGGER.debug("Reconnect attempt %d failed: %s", attempt + 1, err)
+            else:
+                break
+
+        await self.hass.async_add_executor_job(client.loop_start)
+
     async def async_request_discovery(self):
         """Request device discovery from MQTT broker."""
         _LOGGER.info("Requesting device discovery on topic: %s/discover", self.gateway_topic)
         discovery_topic = f"{self.gateway_topic}/discover"
-        await self.hass.async_add_executor_job(self.publish, discovery_topic, "request")
+        await self._async_publish(discovery_topic, "request")
         _LOGGER.info("Discovery request sent. Current devices - Lights: %d, Groups: %d, Scenes: %d", 
                      len(self.lights), len(self.groups), len(self.scenes))
 
-    def _handle_message(self, topic: str, payload: str):
+    def _drain_inbox(self):
+        """Handle all MQTT messages queued by the network thread."""
+        # Clear the flag first so messages arriving while draining schedule
+        # another drain instead of being left in the queue
+        with self._inbox_lock:
+            self._drain_scheduled = False
+        inbox = self._inbox
+        while inbox:
+            topic, payload = inbox.popleft()
+            # A bad message must not leave the rest of the burst queued
+            try:
+                self._handle_message(topic, payload)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling MQTT message on topic %s", topic)
+
+    def _handle_message(self, topic: str, payload: bytes):
         """Handle incoming MQTT message."""
-        _LOGGER.info("Received MQTT message on topic: %s with payload: %s", topic, payload)
+        _LOGGER.debug("Received MQTT message on topic: %s with payload: %s", topic, payload)
         
-        try:
-            data = json.loads(payload) if payload else None
-        except json.JSONDecodeError:
-            _LOGGER.warning("Failed to parse JSON from topic %s: %s (treating as string)", topic, payload)
-            data = payload
+        # Only objects and arrays go through the JSON parser; scalars such as
+        # scene names are passed on as plain strings
+        if not payload:
+            data = None
+        elif payload[:1] in _JSON_CONTAINER_PREFIXES:
+            try:
+                data = _json.loads(payload)
+            except ValueError:
+                _LOGGER.warning("Failed to parse JSON from topic %s: %s (treating as string)", topic, payload)
+                data = payload.decode(errors="replace")
+        else:
+            data = payload.decode(errors="replace")
+
+        updated = None
 
         # Handle discovery messages
-        if topic == f"{self.gateway_topic}/lights":
-            self._handle_lights_discovery(data)
-        elif topic == f"{self.gateway_topic}/groups":
-            self._handle_groups_discovery(data)
-        elif topic == f"{self.gateway_topic}/scenes":
-            self._handle_scenes_discovery(data)
+        handler = self._discovery_dispatch.get(topic)
+        if handler is not None:
+            handler(data)
         # Handle status updates
-        elif "/status" in topic:
-            self._handle_status_update(topic, data)
+        elif topic.endswith("/status"):
+            updated = self._handle_status_update(topic, data)
 
-        # Notify listeners
-        for listener in self._listeners:
-            listener()
+        # Notify listeners of the updated device. Iterate over a copy so
+        # listeners can unsubscribe while being called
+        if updated is not None:
+            for listener in tuple(self._listeners.get(updated, ())):
+                listener()
 
     def _handle_lights_discovery(self, lights: list):
         """Handle lights discovery."""
         if not lights:
             return
-        
-        for light in lights:
-            device_name = light.get("device_name")
-            if device_name:
-                # Parse device capabilities from device_types
-                device_types = light.get("device_types", [])
-                light["supportsColorTemperature"] = "Multiwhite" in device_types
-                light["supportsColor"] = "RGB" in device_types or "RGBW" in device_types
-                light["supports_ctl"] = "Multiwhite" in device_types
-                
-                self.lights[device_name] = light
-                _LOGGER.info("Discovered light: %s (addr: %s, types: %s, location: %s)", 
-                           device_name, light.get("device_addr"), device_types, light.get("location"))
+
+        discovered = {
+            light["device_name"]: light for light in lights if light.get("device_name")
+        }
+        for device_name, light in discovered.items():
+            # Parse device capabilities from device_types
+            device_types = light.get("device_types", [])
+            # Honour capability flags the gateway supplies in either spelling
+            light["supports_ct"] = bool(
+                "Multiwhite" in device_types
+                or light.get("supportsColorTemperature")
+                or light.get("supports_ctl")
+            )
+            light["supports_color"] = bool(
+                "RGB" in device_types
+                or "RGBW" in device_types
+                or light.get("supportsColor")
+                or light.get("supports_hsl")
+            )
+            _LOGGER.debug("Discovered light: %s (addr: %s, types: %s, location: %s)",
+                          device_name, light.get("device_addr"), device_types, light.get("location"))
+
+        self._attach_status("lights", self.lights, discovered)
+        self._merge_discovered("lights", self.lights, discovered)
+        _LOGGER.info("Discovered %d lights", len(discovered))
 
     def _handle_groups_discovery(self, groups: list):
         """Handle groups discovery."""
         if not groups:
             return
-        
-        for group in groups:
-            group_name = group.get("group_name")
-            if group_name:
-                # Groups support all features
-                group["supportsColorTemperature"] = True
-                group["supportsColor"] = True
-                group["supports_ctl"] = True
-                group["supports_hsl"] = True
-                
-                self.groups[group_name] = group
-                _LOGGER.info("Discovered group: %s (addr: %s, devices: %s)", 
-                           group_name, group.get("group_main_addr"), group.get("devices"))
+
+        discovered = {
+            group["group_name"]: group for group in groups if group.get("group_name")
+        }
+        for group_name, group in discovered.items():
+            group.update(_GROUP_CAPABILITIES)
+            _LOGGER.debug("Discovered group: %s (addr: %s, devices: %s)",
+                          group_name, group.get("group_main_addr"), group.get("devices"))
+
+        self._attach_status("groups", self.groups, discovered)
+        self._merge_discovered("groups", self.groups, discovered)
+        _LOGGER.info("Discovered %d groups", len(discovered))
 
     def _handle_scenes_discovery(self, scenes: list):
         """Handle scenes discovery."""
         if not scenes:
             return
-        
-        for scene in scenes:
-            scene_name = scene.get("scene_name")
-            if scene_name:
-                self.scenes[scene_name] = scene
-                _LOGGER.info("Discovered scene: %s (id: %s, groups: %s)", 
-                           scene_name, scene.get("scene_id"), scene.get("groups"))
-
-    def _handle_status_update(self, topic: str, data: dict):
-        """Handle status update."""
-        parts = topic.split("/")
-        
-        if "lights" in parts:
-            idx = parts.index("lights")
-            if idx + 1 < len(parts):
-                device_name = parts[idx + 1]
-                if device_name in self.lights:
-                    self.lights[device_name]["status"] = data
-                    _LOGGER.debug("Updated light %s status: %s", device_name, data)
-        elif "groups" in parts:
-            idx = parts.index("groups")
-            if idx + 1 < len(parts):
-                group_name = parts[idx + 1]
-                if group_name in self.groups:
-                    self.groups[group_name]["status"] = data
-                    _LOGGER.debug("Updated group %s status: %s", group_name, data)
-
-    def subscribe(self, listener):
-        """Subscribe to updates."""
-        self._listeners.append(listener)
-        return lambda: self._listeners.remove(listener)
+
+        discovered = {
+            scene["scene_name"]: scene for scene in scenes if scene.get("scene_name")
+        }
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            for scene_name, scene in discovered.items():
+                _LOGGER.debug("Discovered scene: %s (id: %s, groups: %s)",
+                              scene_name, scene.get("scene_id"), scene.get("groups"))
+
+        self._merge_discovered("scenes", self.scenes, discovered)
+        _LOGGER.info("Discovered %d scenes", len(discovered))
+
+    def _merge_discovered(self, kind: str, known: dict, discovered: dict):
+        """Merge discovered devices and pass the new ones to addition listeners."""
+        added = {
+            name: device for name, device in discovered.items() if name not in known
+        }
+        known.update(discovered)
+        if added:
+            for listener in tuple(self._addition_listeners.get(kind, ())):
+                listener(added)
+
+    def _attach_status(self, kind: str, known: dict, discovered: dict):
+        """Give every discovered device a status dict.
+
+        Entities keep a reference to a device's status dict, so rediscovered
+        devices reuse the one they already have. The status in the discovery
+        payload wins over one received before discovery, which is older; new
+        devices without either start with an empty one.
+        """
+        pending = self._pending_status
+        for name, device in discovered.items():
+            reported = device.get("status")
+            if isinstance(reported, dict):
+                _normalize_status(reported)
+            else:
+                reported = None
+            # Always drop the pending entry so it cannot be applied later
+            pending_status = pending.pop((kind, name), None) if pending else None
+            if reported is None:
+                reported = pending_status
+
+            if reported is not None:
+                self._reported.add((kind, name))
+
+            existing = known.get(name)
+            if existing is not None:
+                status = existing["status"]
+                if reported is not None:
+                    status.clear()
+                    status.update(reported)
+                device["status"] = status
+            else:
+                device["status"] = reported if reported is not None else {}
+
+    def _handle_status_update(self, topic: str, data: dict) -> tuple[str, str] | None:
+        """Handle status update and return the key of the updated device."""
+        # Status topics are always {gateway_topic}/{lights|groups}/{name}/status
+        kind, _, tail = topic[self._status_prefix_len:].partition("/")
+        name, _, _ = tail.partition("/")
+
+        if kind == "lights":
+            target = self.lights
+        elif kind == "groups":
+            target = self.groups
+        else:
+            return None
+
+        if not isinstance(data, dict):
+            _LOGGER.warning("Ignoring invalid status for %s %s: %s", kind, name, data)
+            return None
+        _normalize_status(data)
+
+        device = target.get(name)
+        if device is None:
+            # Keep the status until discovery delivers the device
+            self._pending_status[(kind, name)] = data
+            _LOGGER.debug("Stored status for undiscovered %s %s", kind, name)
+            return None
+
+        # Update in place, entities hold a reference to the status dict
+        status = device["status"]
+        status.clear()
+        status.update(data)
+        self._reported.add((kind, name))
+        _LOGGER.debug("Updated %s %s status: %s", kind, name, data)
+        return (kind, name)
+
+    def is_status_reported(self, entity_type: str, name: str) -> bool:
+        """Return True if the device's status was reported by the gateway."""
+        return (entity_type, name) in self._reported
+
+    def mark_status_guessed(self, entity_type: str, name: str):
+        """Mark the device's status as optimistic until the gateway reports."""
+        self._reported.discard((entity_type, name))
+
+    def _notify_all_listeners(self):
+        """Notify every listener, so entities pick up availability changes."""
+        for listeners in tuple(self._listeners.values()):
+            for listener in tuple(listeners):
+                listener()
+
+    def subscribe(self, listener, key: tuple[str, str]):
+        """Subscribe to updates of the (entity_type, name) device.
+
+        The listener is called for status updates of that device and when the
+        broker connection changes.
+        """
+        listeners = self._listeners.setdefault(key, set())
+        listeners.add(listener)
+        return lambda: listeners.discard(listener)
+
+    def subscribe_additions(self, kind: str, listener: Callable[[dict], None]):
+        """Subscribe to newly discovered lights, groups or scenes.
+
+        The listener is called with a dict of only the devices that were added.
+        """
+        listeners = self._addition_listeners.setdefault(kind, set())
+        listeners.add(listener)
+        return lambda: listeners.discard(listener)
 
     def publish(self, topic: str, payload: Any):
-        """Publish MQTT message."""
+        """Publish MQTT message.
+
+        paho only queues the message for its network thread, so this is safe
+        to call directly from the event loop.
+        """
         if self.mqtt_client and self.mqtt_client.is_connected():
             if isinstance(payload, dict):
-                payload = json.dumps(payload)
+                payload = _json.dumps(payload)
             self.mqtt_client.publish(topic, payload)
         else:
             _LOGGER.error("MQTT client not connected")
 
+    async def _async_publish(self, topic: str, payload: Any):
+        """Publish MQTT message, briefly waiting for a pending reconnect."""
+        if not self.connected.is_set():
+            try:
+                await asyncio.wait_for(
+                    self.connected.wait(), _PUBLISH_CONNECT_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                pass
+        self.publish(topic, payload)
+
     async def async_set_power(self, entity_type: str, name: str, state: bool):
         """Set power state."""
         topic = f"{self.gateway_topic}/{entity_type}/{name}/power"
-        payload = {"onOff": "on" if state else "off"}
-        await self.hass.async_add_executor_job(self.publish, topic, payload)
+        await self._async_publish(topic, _POWER_ON if state else _POWER_OFF)
 
     async def async_set_lightness(self, entity_type: str, name: str, lightness: float):
         """Set lightness (0.0 to 1.0)."""
         topic = f"{self.gateway_topic}/{entity_type}/{name}/lightness"
-        payload = {"lightness": lightness}
-        await self.hass.async_add_executor_job(self.publish, topic, payload)
+        # Callers pass brightness / 255.0, so the exact value is a bounded key
+        key = ("lightness", lightness)
+        payload = self._payload_cache.get(key)
+        if payload is None:
+            payload = self._payload_cache[key] = _json.dumps({"lightness": lightness})
+        await self._async_publish(topic, payload)
 
     async def async_set_hsl(self, entity_type: str, name: str, hue: int, saturation: float, lightness: float):
         """Set HSL values."""
@@ -292,7 +575,7 @@ class HaefeleMeshCoordinator:
             "saturation": saturation,
             "lightness": lightness
         }
-        await self.hass.async_add_executor_job(self.publish, topic, payload)
+        await self._async_publish(topic, payload)
 
     async def async_set_ctl(self, entity_type: str, name: str, temperature: int, lightness: float):
         """Set color temperature and lightness."""
@@ -301,7 +584,11 @@ class HaefeleMeshCoordinator:
             "temperature": temperature,
             "lightness": lightness
         }
-        await self.hass.async_add_executor_job(self.publish, topic, payload)
+        await self._async_publish(topic, payload)
+
+    def schedule_recall_scene(self, scene_name: str):
+        """Recall a scene without waiting for the command to be published."""
+        self.hass.async_create_task(self.async_recall_scene(scene_name))
 
     async def async_recall_scene(self, scene_name: str, target_type: str = None, target_name: str = None):
         """Recall a scene."""
@@ -313,4 +600,4 @@ class HaefeleMeshCoordinator:
             topic = f"{self.gateway_topic}/scenes/recallScene"
         
         payload = scene_name
-        await self.hass.async_add_executor_job(self.publish, topic, payload)
+        await self._async_publish(topic, payload)
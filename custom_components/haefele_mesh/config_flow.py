@@ -1,9 +1,11 @@
 """Config flow for Häfele Mesh integration."""
 from __future__ import annotations
 
+import hashlib
 import logging
 import secrets
-import string
+import socket
+import time
 from typing import Any
 
 import voluptuous as vol
@@ -19,15 +21,61 @@ from .const import CONF_GATEWAY_TOPIC, CONF_PASSWORD, CONF_USERNAME, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds a successful broker probe is trusted for repeated validations
+PROBE_RESULT_TTL = 30
+
+SETUP_TYPE_SCHEMA = vol.Schema({
+    vol.Required("setup_type", default="automatic"): vol.In({
+        "automatic": "Automatic (Mosquitto Add-on)",
+        "manual": "Manual MQTT Configuration"
+    })
+})
+
+AUTOMATIC_SCHEMA = vol.Schema({
+    vol.Required(CONF_GATEWAY_TOPIC, default="Mesh"): str,
+})
+
+MANUAL_SCHEMA = vol.Schema({
+    vol.Required(CONF_HOST, default="localhost"): str,
+    vol.Required(CONF_PORT, default=1883): cv.port,
+    vol.Optional(CONF_USERNAME): str,
+    vol.Optional(CONF_PASSWORD): str,
+    vol.Required(CONF_GATEWAY_TOPIC, default="Mesh"): str,
+})
+
 
 def generate_password(length: int = 32) -> str:
     """Generate a secure random password."""
-    alphabet = string.ascii_letters + string.digits + "!@#$%&*-_"
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    # Every 3 random bytes encode to 4 URL-safe characters
+    return secrets.token_urlsafe((length * 3 + 3) // 4)[:length]
+
+
+def _detect_local_ip() -> str:
+    """Return the local IP address used for outgoing traffic."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(0.5)
+        sock.connect(("8.8.8.8", 80))
+        return sock.getsockname()[0]
 
 
 async def validate_manual_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate manual MQTT configuration."""
+    info = {"title": f"Häfele Mesh ({data[CONF_HOST]})"}
+
+    # Skip the probe if the same broker and credentials validated recently.
+    # Only a hash of the password is kept in the cache key.
+    password = data.get(CONF_PASSWORD)
+    key = (
+        data[CONF_HOST],
+        data[CONF_PORT],
+        data.get(CONF_USERNAME),
+        hashlib.sha256(password.encode()).hexdigest() if password else None,
+    )
+    probe_results = hass.data.setdefault(DOMAIN, {}).setdefault("_probe_results", {})
+    validated_at = probe_results.get(key)
+    if validated_at is not None and time.monotonic() - validated_at < PROBE_RESULT_TTL:
+        return info
+
     try:
         import paho.mqtt.client as mqtt_client
         
@@ -41,12 +89,13 @@ async def validate_manual_input(hass: HomeAssistant, data: dict[str, Any]) -> di
             client.connect, data[CONF_HOST], data[CONF_PORT], 10
         )
         await hass.async_add_executor_job(client.disconnect)
-        
-        return {"title": f"Häfele Mesh ({data[CONF_HOST]})"}
     except Exception as err:
         _LOGGER.error("Could not connect to MQTT broker: %s", err)
         raise CannotConnect from err
 
+    probe_results[key] = time.monotonic()
+    return info
+
 
 async def create_mosquitto_user(hass: HomeAssistant, username: str, password: str) -> bool:
     """Create a user in Mosquitto broker via Home Assistant MQTT integration."""
@@ -90,12 +139,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema({
-                vol.Required("setup_type", default="automatic"): vol.In({
-                    "automatic": "Automatic (Mosquitto Add-on)",
-                    "manual": "Manual MQTT Configuration"
-                })
-            }),
+            data_schema=SETUP_TYPE_SCHEMA,
         )
 
     async def async_step_automatic(
@@ -134,9 +178,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="automatic",
-            data_schema=vol.Schema({
-                vol.Required(CONF_GATEWAY_TOPIC, default="Mesh"): str,
-            }),
+            data_schema=AUTOMATIC_SCHEMA,
             description_placeholders={
                 "info": "A secure user will be created automatically in Mosquitto."
             },
@@ -158,15 +200,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data=self._mqtt_config,
             )
 
-        # Get local IP for display
-        import socket
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-        except Exception:
-            local_ip = "YOUR_HOME_ASSISTANT_IP"
+        # Get local IP for display, detected once outside the event loop
+        domain_data = self.hass.data.setdefault(DOMAIN, {})
+        local_ip = domain_data.get("_local_ip")
+        if local_ip is None:
+            try:
+                local_ip = await self.hass.async_add_executor_job(_detect_local_ip)
+            except OSError:
+                local_ip = "YOUR_HOME_ASSISTANT_IP"
+            else:
+                domain_data["_local_ip"] = local_ip
 
         return self.async_show_form(
             step_id="show_credentials",
@@ -213,13 +256,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="manual",
-            data_schema=vol.Schema({
-                vol.Required(CONF_HOST, default="localhost"): str,
-                vol.Required(CONF_PORT, default=1883): cv.port,
-                vol.Optional(CONF_USERNAME): str,
-                vol.Optional(CONF_PASSWORD): str,
-                vol.Required(CONF_GATEWAY_TOPIC, default="Mesh"): str,
-            }),
+            data_schema=MANUAL_SCHEMA,
             errors=errors,
         )
 
@@ -1,6 +1,7 @@
 """Support for Häfele Mesh lights."""
 from __future__ import annotations
 
+from functools import partial
 import logging
 from typing import Any
 
@@ -23,6 +24,10 @@ from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+# Color temperature range supported by the mesh
+MIN_COLOR_TEMP_KELVIN = 800
+MAX_COLOR_TEMP_KELVIN = 20000
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -32,50 +37,58 @@ async def async_setup_entry(
     """Set up Häfele Mesh lights from a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    # Add individual lights
-    lights = []
-    for device_name, device_info in coordinator.lights.items():
-        lights.append(HaefeleMeshLight(coordinator, device_name, device_info, "lights"))
-
-    # Add groups as lights
-    for group_name, group_info in coordinator.groups.items():
-        lights.append(HaefeleMeshLight(coordinator, group_name, group_info, "groups"))
-
-    async_add_entities(lights, True)
+    async_add_entities(
+        [
+            HaefeleMeshLight(coordinator, name, device_info, entity_type)
+            for entity_type, devices in (
+                ("lights", coordinator.lights),
+                ("groups", coordinator.groups),
+            )
+            for name, device_info in devices.items()
+        ]
+    )
 
-    # Subscribe to updates
-    def update_entities():
-        """Update entities when new devices are discovered."""
-        new_lights = []
-        
-        # Check for new individual lights
-        for device_name, device_info in coordinator.lights.items():
-            if not any(light.unique_id == f"{entry.entry_id}_lights_{device_name}" for light in lights):
-                new_light = HaefeleMeshLight(coordinator, device_name, device_info, "lights")
-                lights.append(new_light)
-                new_lights.append(new_light)
-        
-        # Check for new groups
-        for group_name, group_info in coordinator.groups.items():
-            if not any(light.unique_id == f"{entry.entry_id}_groups_{group_name}" for light in lights):
-                new_light = HaefeleMeshLight(coordinator, group_name, group_info, "groups")
-                lights.append(new_light)
-                new_lights.append(new_light)
-        
-        if new_lights:
-            async_add_entities(new_lights, True)
+    def add_lights(entity_type: str, added: dict[str, dict]) -> None:
+        """Add entities for newly discovered lights or groups."""
+        async_add_entities(
+            [
+                HaefeleMeshLight(coordinator, name, device_info, entity_type)
+                for name, device_info in added.items()
+            ]
+        )
 
-    coordinator.subscribe(update_entities)
+    # Subscribe to newly discovered lights and groups
+    for entity_type in ("lights", "groups"):
+        entry.async_on_unload(
+            coordinator.subscribe_additions(entity_type, partial(add_lights, entity_type))
+        )
 
 
 class HaefeleMeshLight(LightEntity):
     """Representation of a Häfele Mesh Light."""
 
+    # State is pushed by the coordinator over MQTT
+    _attr_should_poll = False
+
+    # The entity base classes keep a __dict__ for the _attr_* values; the
+    # integration's own per-instance state lives in slots
+    __slots__ = (
+        "_coordinator",
+        "_name",
+        "_status",
+        "_entity_type",
+        "_supports_hs",
+        "_supports_ct",
+        "_last_command_key",
+        "_last_command",
+    )
+
     def __init__(self, coordinator, name: str, device_info: dict, entity_type: str):
         """Initialize the light."""
         self._coordinator = coordinator
         self._name = name
-        self._device_info = device_info
+        # Created by the coordinator on discovery and updated in place
+        self._status = device_info["status"]
         self._entity_type = entity_type
         self._attr_unique_id = f"{coordinator.entry.entry_id}_{entity_type}_{name}"
         self._attr_name = name
@@ -87,60 +100,63 @@ class HaefeleMeshLight(LightEntity):
         self._attr_supported_color_modes.add(ColorMode.BRIGHTNESS)
         
         # Check if device supports color temperature
-        if device_info.get("supportsColorTemperature") or device_info.get("supports_ctl"):
+        if device_info.get("supports_ct"):
             self._attr_supported_color_modes.add(ColorMode.COLOR_TEMP)
-            self._attr_min_color_temp_kelvin = 800
-            self._attr_max_color_temp_kelvin = 20000
+            self._attr_min_color_temp_kelvin = MIN_COLOR_TEMP_KELVIN
+            self._attr_max_color_temp_kelvin = MAX_COLOR_TEMP_KELVIN
         
         # Check if device supports color
-        if device_info.get("supportsColor") or device_info.get("supports_hsl"):
+        if device_info.get("supports_color"):
             self._attr_supported_color_modes.add(ColorMode.HS)
         
+        self._supports_hs = ColorMode.HS in self._attr_supported_color_modes
+        self._supports_ct = ColorMode.COLOR_TEMP in self._attr_supported_color_modes
+
         # Set default color mode
-        if ColorMode.HS in self._attr_supported_color_modes:
+        if self._supports_hs:
             self._attr_color_mode = ColorMode.HS
-        elif ColorMode.COLOR_TEMP in self._attr_supported_color_modes:
+        elif self._supports_ct:
             self._attr_color_mode = ColorMode.COLOR_TEMP
         else:
             self._attr_color_mode = ColorMode.BRIGHTNESS
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        device_types = self._device_info.get("device_types", [])
-        model = ", ".join(device_types) if device_types else "Mesh Device"
-        
-        return {
+        # Device information does not change, so build it once
+        device_types = device_info.get("device_types", [])
+        self._attr_device_info = {
             "identifiers": {(DOMAIN, self._attr_unique_id)},
-            "name": self._name,
+            "name": name,
             "manufacturer": "Häfele",
-            "model": model,
-            "suggested_area": self._device_info.get("location"),
-            "via_device": (DOMAIN, self._coordinator.entry.entry_id),
+            "model": ", ".join(device_types) if device_types else "Mesh Device",
+            "suggested_area": device_info.get("location"),
+            "via_device": (DOMAIN, coordinator.entry.entry_id),
         }
 
+        self._last_command_key: tuple | None = None
+        self._last_command: tuple[float, int | None, float | None] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Register for status updates of this device."""
+        self.async_on_remove(
+            self._coordinator.subscribe(
+                self.async_write_ha_state, (self._entity_type, self._name)
+            )
+        )
+
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.mqtt_client and self._coordinator.mqtt_client.is_connected()
+        return self._coordinator.is_connected
 
     @property
     def is_on(self) -> bool:
         """Return true if light is on."""
-        status = self._device_info.get("status", {})
-        on_off = status.get("onOff")
-        
-        if isinstance(on_off, bool):
-            return on_off
-        elif isinstance(on_off, str):
-            return on_off.lower() == "on"
-        
-        return False
+        # The coordinator stores onOff as a bool on ingestion
+        return self._status.get("onOff", False)
 
     @property
     def brightness(self) -> int | None:
         """Return the brightness of this light between 0..255."""
-        status = self._device_info.get("status", {})
+        status = self._status
         lightness = status.get("lightness")
         
         if lightness is not None:
@@ -152,10 +168,10 @@ class HaefeleMeshLight(LightEntity):
     @property
     def hs_color(self) -> tuple[float, float] | None:
         """Return the hue and saturation color value [float, float]."""
-        if ColorMode.HS not in self._attr_supported_color_modes:
+        if not self._supports_hs:
             return None
         
-        status = self._device_info.get("status", {})
+        status = self._status
         hue = status.get("hue")
         saturation = status.get("saturation")
         
@@ -168,48 +184,45 @@ class HaefeleMeshLight(LightEntity):
     @property
     def color_temp_kelvin(self) -> int | None:
         """Return the CT color value in Kelvin."""
-        if ColorMode.COLOR_TEMP not in self._attr_supported_color_modes:
+        if not self._supports_ct:
             return None
         
-        status = self._device_info.get("status", {})
-        temperature = status.get("temperature")
-        
-        if temperature is not None:
-            return int(temperature)
-        
-        return None
+        # The coordinator stores the temperature as an int on ingestion
+        return self._status.get("temperature")
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         brightness = kwargs.get(ATTR_BRIGHTNESS, 255)  # Default to 100% brightness
         hs_color = kwargs.get(ATTR_HS_COLOR)
         color_temp_kelvin = kwargs.get(ATTR_COLOR_TEMP_KELVIN)
+        temperature = int(color_temp_kelvin) if color_temp_kelvin is not None else None
+        lightness, hue, saturation = self._convert_command(brightness, hs_color)
 
-        if hs_color is not None and ColorMode.HS in self._attr_supported_color_modes:
-            # Set HSL
-            hue, saturation = hs_color
-            lightness = brightness / 255.0
+        if self._matches_current_state(brightness, hue, saturation, temperature):
+            # Nothing to send, the light is already in the requested state
+            self.async_write_ha_state()
+            return
+
+        # Brightness rides along with the color or color temperature, so
+        # every turn_on is a single command
+        if hue is not None and self._supports_hs:
             await self._coordinator.async_set_hsl(
                 self._entity_type,
                 self._name,
-                int(hue),
-                saturation / 100.0,  # Convert from 0-100 to 0.0-1.0
+                hue,
+                saturation,
                 lightness,
             )
             self._attr_color_mode = ColorMode.HS
-        elif color_temp_kelvin is not None and ColorMode.COLOR_TEMP in self._attr_supported_color_modes:
-            # Set CTL
-            lightness = brightness / 255.0
+        elif temperature is not None and self._supports_ct:
             await self._coordinator.async_set_ctl(
                 self._entity_type,
                 self._name,
-                int(color_temp_kelvin),
+                temperature,
                 lightness,
             )
             self._attr_color_mode = ColorMode.COLOR_TEMP
         else:
-            # Set brightness (always set to 100% by default)
-            lightness = brightness / 255.0
             await self._coordinator.async_set_lightness(
                 self._entity_type,
                 self._name,
@@ -217,22 +230,67 @@ class HaefeleMeshLight(LightEntity):
             )
 
         # Update status optimistically
-        if "status" not in self._device_info:
-            self._device_info["status"] = {}
-        
-        self._device_info["status"]["onOff"] = True
-        self._device_info["status"]["lightness"] = brightness / 255.0
+        self._coordinator.mark_status_guessed(self._entity_type, self._name)
+        status = self._status
+        status["onOff"] = True
+        status["lightness"] = lightness
         
-        if hs_color is not None:
-            hue, saturation = hs_color
-            self._device_info["status"]["hue"] = int(hue)
-            self._device_info["status"]["saturation"] = saturation / 100.0
+        if hue is not None:
+            status["hue"] = hue
+            status["saturation"] = saturation
         
-        if color_temp_kelvin is not None:
-            self._device_info["status"]["temperature"] = int(color_temp_kelvin)
+        if temperature is not None:
+            status["temperature"] = temperature
         
         self.async_write_ha_state()
 
+    def _convert_command(
+        self, brightness: int, hs_color: tuple[float, float] | None
+    ) -> tuple[float, int | None, float | None]:
+        """Convert Home Assistant values to mesh lightness, hue and saturation.
+
+        The last conversion is kept, as scenes and dashboards tend to send
+        the same values repeatedly.
+        """
+        key = (brightness, hs_color)
+        if key != self._last_command_key:
+            hue = saturation = None
+            if hs_color is not None:
+                hue = int(hs_color[0])
+                saturation = hs_color[1] / 100.0  # Convert from 0-100 to 0.0-1.0
+            self._last_command_key = key
+            self._last_command = (brightness / 255.0, hue, saturation)
+        return self._last_command
+
+    def _matches_current_state(
+        self,
+        brightness: int,
+        hue: int | None,
+        saturation: float | None,
+        temperature: int | None,
+    ) -> bool:
+        """Return True if the light already has the requested state."""
+        # Only trust state the device reported; an optimistic guess may belong
+        # to a command that never arrived
+        if not self._coordinator.is_status_reported(self._entity_type, self._name):
+            return False
+        if not self.is_on or self.brightness != brightness:
+            return False
+
+        status = self._status
+        if hue is not None and self._supports_hs:
+            return (
+                self._attr_color_mode == ColorMode.HS
+                and status.get("hue") == hue
+                and status.get("saturation") == saturation
+            )
+        if temperature is not None and self._supports_ct:
+            return (
+                self._attr_color_mode == ColorMode.COLOR_TEMP
+                and status.get("temperature") == temperature
+            )
+        return True
+
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
         await self._coordinator.async_set_power(
@@ -242,10 +300,8 @@ class HaefeleMeshLight(LightEntity):
         )
         
         # Update status optimistically
-        if "status" not in self._device_info:
-            self._device_info["status"] = {}
-        
-        self._device_info["status"]["onOff"] = False
+        self._coordinator.mark_status_guessed(self._entity_type, self._name)
+        self._status["onOff"] = False
         self.async_write_ha_state()
 
     async def async_update(self) -> None:
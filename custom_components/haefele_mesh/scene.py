@@ -22,56 +22,63 @@ async def async_setup_entry(
     """Set up Häfele Mesh scenes from a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    scenes = []
-    for scene_name, scene_info in coordinator.scenes.items():
-        scenes.append(HaefeleMeshScene(coordinator, scene_name, scene_info))
-
-    async_add_entities(scenes, True)
-
-    # Subscribe to updates for new scenes
-    def update_entities():
-        """Update entities when new scenes are discovered."""
-        new_scenes = []
-        
-        for scene_name, scene_info in coordinator.scenes.items():
-            if not any(scene.unique_id == f"{entry.entry_id}_scene_{scene_name}" for scene in scenes):
-                new_scene = HaefeleMeshScene(coordinator, scene_name, scene_info)
-                scenes.append(new_scene)
-                new_scenes.append(new_scene)
-        
-        if new_scenes:
-            async_add_entities(new_scenes, True)
-
-    coordinator.subscribe(update_entities)
+    async_add_entities(
+        [
+            HaefeleMeshScene(coordinator, scene_name, scene_info)
+            for scene_name, scene_info in coordinator.scenes.items()
+        ]
+    )
+
+    def add_scenes(added: dict[str, dict]) -> None:
+        """Add entities for newly discovered scenes."""
+        async_add_entities(
+            [
+                HaefeleMeshScene(coordinator, scene_name, scene_info)
+                for scene_name, scene_info in added.items()
+            ]
+        )
+
+    # Subscribe to newly discovered scenes
+    entry.async_on_unload(coordinator.subscribe_additions("scenes", add_scenes))
 
 
 class HaefeleMeshScene(Scene):
     """Representation of a Häfele Mesh Scene."""
 
+    # State is pushed by the coordinator over MQTT
+    _attr_should_poll = False
+
+    __slots__ = ("_coordinator", "_name")
+
     def __init__(self, coordinator, name: str, scene_info: dict):
         """Initialize the scene."""
         self._coordinator = coordinator
         self._name = name
-        self._scene_info = scene_info
         self._attr_unique_id = f"{coordinator.entry.entry_id}_scene_{name}"
         self._attr_name = name
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self._coordinator.entry.entry_id)},
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.entry.entry_id)},
             "name": "Häfele Mesh Gateway",
             "manufacturer": "Häfele",
             "model": "Mesh Gateway",
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Register for availability changes."""
+        self.async_on_remove(
+            self._coordinator.subscribe(
+                self.async_write_ha_state, ("scenes", self._name)
+            )
+        )
+
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._coordinator.mqtt_client and self._coordinator.mqtt_client.is_connected()
+        return self._coordinator.is_connected
 
     async def async_activate(self, **kwargs: Any) -> None:
         """Activate the scene."""
-        await self._coordinator.async_recall_scene(self._name)
+        # The gateway sends no response to a recall, so don't wait for the
+        # publish, which may be held back while reconnecting
+        self._coordinator.schedule_recall_scene(self._name)
         _LOGGER.info("Activated scene: %s", self._name)